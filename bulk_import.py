@@ -0,0 +1,234 @@
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from github_action_processor import AUDIO_EXTENSIONS, is_audio_url, parse_issue_body
+from main import write_json_atomic
+
+
+# Typical podcast bitrates in kbit/s, used to estimate duration from size
+BITRATES_KBPS = {
+    '.mp3': 128,
+    '.m4a': 128,
+    '.aac': 128,
+    '.ogg': 96,
+    '.flac': 800,
+    '.wav': 1411,
+}
+
+CONTENT_TYPE_EXTENSIONS = {
+    'audio/mpeg': '.mp3',
+    'audio/mp3': '.mp3',
+    'audio/mp4': '.m4a',
+    'audio/x-m4a': '.m4a',
+    'audio/aac': '.aac',
+    'audio/ogg': '.ogg',
+    'audio/flac': '.flac',
+    'audio/x-flac': '.flac',
+    'audio/wav': '.wav',
+    'audio/x-wav': '.wav',
+    'audio/vnd.wave': '.wav',
+}
+
+DEFAULT_WORKERS = 16
+
+# Timeouts and rate limits say nothing about the URL itself
+TRANSIENT_STATUSES = (408, 429)
+
+
+def iter_issue_export(path):
+    """Stream issue records from a JSONL export, skipping blank and malformed lines."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Warning: Skipping line {line_number} of {path}: {e}")
+
+
+def parse_issue_record(record: dict) -> dict:
+    """Extract an import entry from one exported issue (title, body, number)."""
+    title, url, content = parse_issue_body(record.get("body") or "", record.get("title") or "")
+    return {
+        "issue": record.get("number"),
+        "title": title,
+        "url": url,
+        "content": content,
+    }
+
+
+def audio_extension(url: str, content_type: str = "") -> str:
+    """Best guess at an audio file's extension from its content type or URL."""
+    media_type = content_type.split(';')[0].strip().lower()
+    if media_type in CONTENT_TYPE_EXTENSIONS:
+        return CONTENT_TYPE_EXTENSIONS[media_type]
+
+    suffix = Path(urlparse(url).path).suffix.lower()
+    return suffix if suffix in AUDIO_EXTENSIONS else ""
+
+
+def estimate_duration_s(content_length, extension: str):
+    """Estimate audio duration in seconds from its size, or None if unknown."""
+    if not content_length or extension not in BITRATES_KBPS:
+        return None
+    return round(content_length * 8 / (BITRATES_KBPS[extension] * 1000), 1)
+
+
+def is_definitive(result: dict) -> bool:
+    """Whether a URL check would give the same answer if repeated."""
+    status = result.get("status")
+    return status is not None and status < 500 and status not in TRANSIENT_STATUSES
+
+
+class UrlValidator:
+    """Concurrent HEAD checks over a pooled session, cached per URL.
+
+    The cache is optionally persisted as JSON so re-running an import only
+    checks URLs it has not seen before. Only definitive answers are cached;
+    network errors, 5xx, 408 and 429 are checked again next time.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, timeout: float = 10, cache_path=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cache = {}
+        if self.cache_path and self.cache_path.exists():
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.cache = {url: result for url, result in json.load(f).items() if is_definitive(result)}
+
+        # One keep-alive connection per worker and host, reused across checks
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = "podcast-transcriber-bulk-import"
+
+    def check(self, url: str) -> dict:
+        """Check one URL; returns status, content type, content length and validity."""
+        if url in self.cache:
+            return self.cache[url]
+
+        result = {"status": None, "content_type": "", "content_length": None, "valid": False}
+        try:
+            response = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+            # Some hosts reject HEAD; a one-byte range GET still reports the size
+            if response.status_code in (403, 405, 501):
+                response = self.session.get(url, headers={"Range": "bytes=0-0"}, stream=True,
+                                            allow_redirects=True, timeout=self.timeout)
+                response.close()
+
+            content_type = response.headers.get("Content-Type", "")
+            content_length = response.headers.get("Content-Length")
+            content_range = response.headers.get("Content-Range", "")
+            if response.status_code == 206 and "/" in content_range:
+                content_length = content_range.rsplit("/", 1)[1]
+
+            result["status"] = response.status_code
+            result["content_type"] = content_type
+            result["content_length"] = int(content_length) if content_length and content_length.isdigit() else None
+
+            media_type = content_type.split(';')[0].strip().lower()
+            result["valid"] = response.status_code < 400 and (
+                media_type.startswith("audio/")
+                or (media_type in ("", "application/octet-stream", "binary/octet-stream") and is_audio_url(url))
+            )
+        except requests.RequestException as e:
+            result["error"] = str(e)
+
+        if is_definitive(result):
+            self.cache[url] = result
+        return result
+
+    def check_all(self, urls) -> dict:
+        """Check many URLs concurrently; returns url -> result."""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return dict(zip(urls, executor.map(self.check, urls)))
+
+    def save(self):
+        """Persist the cache atomically."""
+        if self.cache_path:
+            write_json_atomic(self.cache_path, self.cache)
+
+
+def build_manifest(export_path, validator: UrlValidator = None):
+    """Parse an issue export and validate its audio URLs.
+
+    Returns (manifest, rejected). The manifest is sorted by estimated duration,
+    longest first, with entries of unknown duration last.
+    """
+    if validator is None:
+        validator = UrlValidator()
+
+    entries = [parse_issue_record(record) for record in iter_issue_export(export_path)]
+    checks = validator.check_all(entry["url"] for entry in entries)
+
+    manifest = []
+    rejected = []
+    for entry in entries:
+        check = checks.get(entry["url"])
+        if not entry["title"] or check is None:
+            entry["reason"] = "missing title or URL"
+        elif not check["valid"]:
+            entry["reason"] = check.get("error") or f"HTTP {check['status']}, {check['content_type'] or 'no content type'}"
+        if "reason" in entry:
+            rejected.append(entry)
+            continue
+
+        extension = audio_extension(entry["url"], check["content_type"])
+        entry["content_type"] = check["content_type"]
+        entry["content_length"] = check["content_length"]
+        entry["estimated_duration_s"] = estimate_duration_s(check["content_length"], extension)
+        manifest.append(entry)
+
+    manifest.sort(key=lambda entry: (entry["estimated_duration_s"] is None, -(entry["estimated_duration_s"] or 0)))
+    return manifest, rejected
+
+
+def write_jsonl(path, entries: list):
+    """Write entries as one JSON object per line."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def main():
+    """Command-line entry point for turning an issue export into a manifest."""
+    parser = argparse.ArgumentParser(description="Validate an exported issue backlog and write a transcription manifest.")
+    parser.add_argument("export", help="JSONL file with one issue (title, body, number) per line")
+    parser.add_argument("--output", default="manifest.jsonl", help="Manifest file (default: manifest.jsonl)")
+    parser.add_argument("--rejected", help="Also write rejected entries to this file")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent URL checks (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--cache", help="JSON file caching URL checks between runs")
+    args = parser.parse_args()
+
+    validator = UrlValidator(args.workers, cache_path=args.cache)
+    try:
+        manifest, rejected = build_manifest(args.export, validator)
+    finally:
+        validator.save()
+
+    write_jsonl(args.output, manifest)
+    if args.rejected:
+        write_jsonl(args.rejected, rejected)
+
+    for entry in rejected:
+        print(f"Rejected #{entry['issue']} {entry['title'] or entry['url']}: {entry['reason']}")
+
+    total_s = sum(entry["estimated_duration_s"] or 0 for entry in manifest)
+    print(f"Manifest saved to: {args.output} ({len(manifest)} episode(s), ~{total_s / 3600:.1f}h of audio, "
+          f"{len(rejected)} rejected)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+import requests
+from fingerprint import FingerprintIndex
+from github_action_processor import create_transcript_file, slugify
+from main import LanguageCache, PodcastTranscriber, write_json_atomic
+from word_index import build_word_index, word_index_path
+
+
+FEED_STATE_DIR = Path("feeds")
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+def read_feed(source: str) -> bytes:
+    """Read a feed from a local file or an http(s) URL."""
+    if source.startswith(("http://", "https://")):
+        response = requests.get(source, timeout=30)
+        response.raise_for_status()
+        return response.content
+
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _text(element, path: str) -> str:
+    """Return the stripped text of a child element, or an empty string."""
+    child = element.find(path)
+    if child is None or child.text is None:
+        return ""
+    return child.text.strip()
+
+
+def parse_feed(data: bytes):
+    """Parse an RSS 2.0 or Atom feed into (feed title, episodes).
+
+    Each episode is a dict with guid, title, url and content. Entries without
+    an audio enclosure are skipped.
+    """
+    root = ET.fromstring(data)
+    episodes = []
+
+    if root.tag == f"{ATOM_NS}feed":
+        feed_title = _text(root, f"{ATOM_NS}title")
+        for entry in root.iter(f"{ATOM_NS}entry"):
+            url = ""
+            for link in entry.findall(f"{ATOM_NS}link"):
+                if link.get("rel") == "enclosure":
+                    url = link.get("href", "").strip()
+                    break
+            if not url:
+                continue
+
+            episodes.append({
+                "guid": _text(entry, f"{ATOM_NS}id") or url,
+                "title": _text(entry, f"{ATOM_NS}title"),
+                "url": url,
+                "content": _text(entry, f"{ATOM_NS}summary") or _text(entry, f"{ATOM_NS}content"),
+            })
+    else:
+        channel = root.find("channel")
+        if channel is None:
+            raise ValueError(f"Unsupported feed format: <{root.tag}>")
+
+        feed_title = _text(channel, "title")
+        for item in channel.iter("item"):
+            enclosure = item.find("enclosure")
+            url = enclosure.get("url", "").strip() if enclosure is not None else ""
+            if not url:
+                continue
+
+            episodes.append({
+                "guid": _text(item, "guid") or url,
+                "title": _text(item, "title"),
+                "url": url,
+                "content": _text(item, "description"),
+            })
+
+    return feed_title, episodes
+
+
+def _short_hash(value: str) -> str:
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:10]
+
+
+def feed_state_path(source: str, feed_title: str = "") -> Path:
+    """State file of a feed, keyed by its source so same-titled feeds never share one."""
+    if not source.startswith(("http://", "https://")):
+        source = os.path.abspath(source)
+    return FEED_STATE_DIR / f"{slugify(feed_title) or 'feed'}-{_short_hash(source)}.json"
+
+
+def episode_filename(feed_title: str, episode: dict) -> str:
+    """Transcript file name of an episode; the GUID keeps same-titled episodes apart."""
+    title = f"{feed_title} {episode['title']}"
+    return f"{slugify(title) or 'episode'}-{_short_hash(episode['guid'])}"
+
+
+def load_feed_state(state_path: Path) -> dict:
+    """Load the transcribed-episode state of a feed (guid -> {url, transcript})."""
+    if not state_path.exists():
+        return {}
+
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_feed_state(state_path: Path, state: dict):
+    """Write the feed state atomically so an interrupted run never corrupts it."""
+    write_json_atomic(state_path, state, indent=2, sort_keys=True)
+
+
+def new_episodes(episodes: list, state: dict) -> list:
+    """Return the episodes whose GUID and enclosure URL are both unknown."""
+    known_urls = {entry["url"] for entry in state.values()}
+    return [
+        episode for episode in episodes
+        if episode["guid"] not in state and episode["url"] not in known_urls
+    ]
+
+
+async def process_episode(transcriber, episode: dict, feed_title: str, semaphore, model_lock, model_ready):
+    """Download and transcribe one episode; returns the transcript file path or None."""
+    url = episode["url"]
+    index = transcriber.fingerprint_index
+
+    # The semaphore bounds how many episodes of this feed are in flight, so
+    # the next downloads overlap with the current transcription
+    async with semaphore:
+        fingerprint = None
+        with tempfile.TemporaryDirectory() as temp_dir:
+            existing = None
+            words = []
+            audio_path = os.path.join(temp_dir, "podcast_audio.mp3")
+            if index is not None:
+                # The prefix goes straight into audio_path so the full download resumes from it
+                fingerprint = await asyncio.to_thread(transcriber.fingerprint_url, url, temp_dir, audio_path)
+                if fingerprint is not None:
+                    existing = index.lookup(fingerprint)
+
+            if existing:
+                transcript = transcriber.load_existing_transcript(existing)
+            else:
+                if not await asyncio.to_thread(transcriber.download_audio, url, audio_path, True):
+                    return None
+
+                await model_ready()
+                # One model instance is shared, so inference runs one episode at a time
+                async with model_lock:
+                    transcript = await asyncio.to_thread(transcriber.transcribe_audio, audio_path, url)
+                    words = transcriber.last_words
+
+    if not transcript:
+        print(f"Error: Failed to transcribe {url}")
+        return None
+
+    title = f"{feed_title} - {episode['title']}" if feed_title else episode["title"]
+    filepath = create_transcript_file(title, episode["content"], transcript, episode_filename(feed_title, episode))
+    print(f"Transcript saved to: {filepath}")
+
+    if index is not None and fingerprint is not None:
+        index.add(fingerprint, filepath, url)
+
+    if words:
+        build_word_index(words, word_index_path(filepath))
+
+    return filepath
+
+
+async def ingest_feed(transcriber, source: str, model_lock, model_ready, max_concurrent: int = 3, limit: int = None) -> int:
+    """Transcribe the new episodes of one feed; returns how many succeeded."""
+    feed_title, episodes = await asyncio.to_thread(lambda: parse_feed(read_feed(source)))
+
+    state_path = feed_state_path(source, feed_title)
+    state = load_feed_state(state_path)
+    if not state:
+        # Older versions keyed the state by title only; pick up where they left off
+        state = load_feed_state(FEED_STATE_DIR / f"{slugify(feed_title) or 'feed'}.json")
+
+    pending = new_episodes(episodes, state)
+    if limit is not None:
+        pending = pending[:limit]
+
+    print(f"Feed '{feed_title}': {len(episodes)} episode(s), {len(pending)} new")
+    if pending:
+        # Start loading the model while the first episodes download
+        model_ready()
+
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run(episode):
+        filepath = await process_episode(transcriber, episode, feed_title, semaphore, model_lock, model_ready)
+        if filepath:
+            # Record progress after every episode so an interrupted back-fill resumes
+            state[episode["guid"]] = {"url": episode["url"], "transcript": filepath}
+            save_feed_state(state_path, state)
+        return filepath
+
+    results = await asyncio.gather(*(run(episode) for episode in pending))
+    return sum(1 for filepath in results if filepath)
+
+
+async def ingest_feeds(sources: list, max_concurrent: int = 3, limit: int = None, transcriber=None) -> int:
+    """Transcribe the new episodes of several feeds with one shared model."""
+    if transcriber is None:
+        transcriber = PodcastTranscriber(
+            load_model=False, fingerprint_index=FingerprintIndex(), language_cache=LanguageCache()
+        )
+
+    # The model is loaded once, as soon as any feed has new episodes
+    load_task = None
+
+    def model_ready():
+        nonlocal load_task
+        if load_task is None:
+            load_task = asyncio.create_task(asyncio.to_thread(transcriber.load_episode_model))
+        return load_task
+
+    model_lock = asyncio.Lock()
+
+    counts = await asyncio.gather(*(
+        ingest_feed(transcriber, source, model_lock, model_ready, max_concurrent, limit)
+        for source in sources
+    ))
+
+    return sum(counts)
+
+
+def main():
+    """Command-line entry point for back-filling podcast feeds."""
+    parser = argparse.ArgumentParser(description="Transcribe new episodes from podcast RSS/Atom feeds.")
+    parser.add_argument("feeds", nargs="+", help="Feed file paths or URLs")
+    parser.add_argument("--max-concurrent", type=int, default=3,
+                        help="Episodes per feed downloading/transcribing at once (default: 3)")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Transcribe at most this many new episodes per feed")
+    args = parser.parse_args()
+
+    transcribed = asyncio.run(ingest_feeds(args.feeds, args.max_concurrent, args.limit))
+    print(f"Transcribed {transcribed} new episode(s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+import numpy as np
+import librosa
+from pathlib import Path
+
+
+# The start and the middle of an episode are fingerprinted, so two partial
+# downloads are enough. Episodes of one show can share a long intro, so the
+# start alone is not trusted.
+FINGERPRINT_SECONDS = 120
+# Enough bytes to cover FINGERPRINT_SECONDS of audio at up to ~256 kbps
+PREFIX_BYTES = 4 * 1024 * 1024
+
+# Spectrogram and landmark settings (16 kHz input, 32 ms window, 16 ms hop)
+N_FFT = 512
+HOP_LENGTH = 256
+MAX_BIN = 128          # Ignore content above 4 kHz, it rarely survives re-encodes
+PEAK_NEIGHBORHOOD = (15, 15)
+FAN_OUT = 5
+MAX_DELTA = 63
+
+# A candidate matches when enough query landmarks line up at one time offset
+MIN_MATCHES = 20
+MATCH_THRESHOLD = 0.05
+# ...and when those landmarks are spread over most of the overlapping audio,
+# so episodes of one show that only share an intro jingle are not confused
+COVERAGE_BUCKET_FRAMES = 625  # 10 seconds
+MIN_COVERAGE = 0.6
+
+FINGERPRINT_DIR = Path("fingerprints")
+
+
+def maximum_filter(values, size):
+    """Maximum over the size[0] x size[1] neighbourhood of every element.
+
+    A 2-D maximum is two 1-D maxima, one per axis; neighbours past the edges
+    are ignored.
+    """
+    for axis, width in enumerate(size):
+        pad = [(0, 0)] * values.ndim
+        pad[axis] = (width // 2, width - 1 - width // 2)
+        padded = np.pad(values, pad, constant_values=-np.inf)
+        values = np.lib.stride_tricks.sliding_window_view(padded, width, axis=axis).max(axis=-1)
+    return values
+
+
+def compute_fingerprint(audio, sampling_rate: int = 16000, seconds: float = FINGERPRINT_SECONDS):
+    """Compute landmark hashes for the first `seconds` of decoded audio.
+
+    Returns (hashes, offsets) where each hash packs a pair of spectrogram peaks
+    (anchor frequency, target frequency, frame distance) and offsets holds the
+    anchor frame of each hash.
+    """
+    audio = np.asarray(audio[:int(seconds * sampling_rate)], dtype=np.float32)
+    if sampling_rate != 16000:
+        audio = librosa.resample(audio, orig_sr=sampling_rate, target_sr=16000)
+
+    spectrum = np.abs(librosa.stft(audio, n_fft=N_FFT, hop_length=HOP_LENGTH))[:MAX_BIN]
+    spectrum = librosa.amplitude_to_db(spectrum, ref=np.max)
+
+    # Peaks are local maxima that stand out from the overall level
+    peaks = (spectrum == maximum_filter(spectrum, PEAK_NEIGHBORHOOD)) & (spectrum > np.median(spectrum) + 10)
+    freqs, frames = np.nonzero(peaks)
+    order = np.argsort(frames, kind="stable")
+    freqs, frames = freqs[order], frames[order]
+
+    hashes = []
+    offsets = []
+    # Pair each anchor peak with the next FAN_OUT peaks that follow it
+    for shift in range(1, FAN_OUT + 1):
+        delta = frames[shift:] - frames[:-shift]
+        valid = (delta > 0) & (delta <= MAX_DELTA)
+        anchor_freqs = freqs[:-shift][valid]
+        target_freqs = freqs[shift:][valid]
+        hashes.append((anchor_freqs << 13) | (target_freqs << 6) | delta[valid])
+        offsets.append(frames[:-shift][valid])
+
+    if not hashes:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32)
+
+    return np.concatenate(hashes).astype(np.uint32), np.concatenate(offsets).astype(np.uint32)
+
+
+def middle_window(total_samples: int, sampling_rate: int = 16000, seconds: float = FINGERPRINT_SECONDS):
+    """Return (first sample, sample count) of `seconds` centred on the middle of the audio."""
+    count = min(total_samples, int(seconds * sampling_rate))
+    return (total_samples - count) // 2, count
+
+
+def fingerprint_episode(start_audio, middle_audio, sampling_rate: int = 16000):
+    """Fingerprint the start and the middle window of an episode.
+
+    Returns (start, middle), each (hashes, offsets); middle is None when
+    middle_audio is None.
+    """
+    start = compute_fingerprint(start_audio, sampling_rate)
+    middle = compute_fingerprint(middle_audio, sampling_rate) if middle_audio is not None else None
+    return start, middle
+
+
+def match_score(query, candidate) -> float:
+    """Fraction of query landmarks that line up with the candidate at one time offset."""
+    query_hashes, query_offsets = query
+    hashes, offsets = candidate
+    if len(query_hashes) == 0 or len(hashes) == 0:
+        return 0.0
+
+    # Peaks of a re-encoded or shifted copy can move by one frame, so also
+    # look up each query landmark with its frame distance nudged by +/-1
+    delta = (query_hashes & MAX_DELTA).astype(np.int64)
+    lookup_hashes = [query_hashes]
+    lookup_offsets = [query_offsets]
+    for nudge in (-1, 1):
+        valid = (delta + nudge > 0) & (delta + nudge <= MAX_DELTA)
+        lookup_hashes.append((query_hashes[valid].astype(np.int64) + nudge).astype(np.uint32))
+        lookup_offsets.append(query_offsets[valid])
+    lookup_hashes = np.concatenate(lookup_hashes)
+    lookup_offsets = np.concatenate(lookup_offsets)
+
+    # Find every (query, candidate) pair with the same hash
+    left = np.searchsorted(hashes, lookup_hashes, side="left")
+    right = np.searchsorted(hashes, lookup_hashes, side="right")
+    counts = right - left
+    total = int(counts.sum())
+    if total == 0:
+        return 0.0
+
+    starts = np.repeat(left - np.cumsum(counts) + counts, counts)
+    positions = starts + np.arange(total)
+    deltas = offsets[positions].astype(np.int64) - np.repeat(lookup_offsets, counts).astype(np.int64)
+
+    # Re-hosted copies share landmarks at a constant offset (e.g. an inserted
+    # preroll); neighbouring offsets are pooled to absorb one frame of jitter
+    histogram = np.bincount(deltas - deltas.min())
+    aligned = np.convolve(histogram, np.ones(3, dtype=np.int64), mode="same")
+    best = int(aligned.max())
+    if best < MIN_MATCHES:
+        return 0.0
+
+    # Check the aligned landmarks cover the audio both fingerprints share
+    best_delta = int(np.argmax(aligned)) + int(deltas.min())
+    matched = np.abs(deltas - best_delta) <= 1
+    matched_buckets = np.unique(np.repeat(lookup_offsets, counts)[matched] // COVERAGE_BUCKET_FRAMES)
+    shifted = query_offsets.astype(np.int64) + best_delta
+    shared = query_offsets[(shifted >= 0) & (shifted <= int(offsets.max()))]
+    shared_buckets = np.unique(shared // COVERAGE_BUCKET_FRAMES)
+    if len(shared_buckets) == 0 or len(matched_buckets) / len(shared_buckets) < MIN_COVERAGE:
+        return 0.0
+
+    return min(1.0, best / len(query_hashes))
+
+
+class FingerprintIndex:
+    """Directory of per-episode fingerprints used to spot re-hosted episodes.
+
+    Each transcript gets its own .npz file so that concurrent transcription
+    pull requests never conflict on a shared index file. An episode matches
+    only when both its start and its middle window match.
+    """
+
+    def __init__(self, directory=FINGERPRINT_DIR):
+        self.directory = Path(directory)
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = []
+            for path in sorted(self.directory.glob("*.npz")):
+                with np.load(path) as data:
+                    # Fingerprints stored before middle windows were added have none
+                    middle = (data["middle_hashes"], data["middle_offsets"]) if "middle_hashes" in data.files else None
+                    self._entries.append((
+                        ((data["hashes"], data["offsets"]), middle),
+                        str(data["transcript"]),
+                    ))
+        return self._entries
+
+    def lookup(self, fingerprint) -> str:
+        """Return the transcript path of the best matching episode, or None."""
+        start, middle = fingerprint
+        if middle is None:
+            # A matching start may just be a shared intro
+            return None
+
+        best_path = None
+        best_score = MATCH_THRESHOLD
+
+        for (candidate_start, candidate_middle), transcript_path in self._load():
+            # Ignore fingerprints whose transcript has since been removed
+            if candidate_middle is None or not Path(transcript_path).exists():
+                continue
+            score = min(match_score(start, candidate_start), match_score(middle, candidate_middle))
+            if score >= best_score:
+                best_path, best_score = transcript_path, score
+
+        if best_path:
+            print(f"Found matching episode ({best_score:.0%} of landmarks aligned): {best_path}")
+
+        return best_path
+
+    def add(self, fingerprint, transcript_path: str, url: str = "") -> str:
+        """Store the fingerprint of a newly transcribed episode.
+
+        Returns the path of the fingerprint file, or None if the episode has
+        no middle window and could never be matched.
+        """
+        (hashes, offsets), middle = fingerprint
+        if middle is None:
+            return None
+        middle_hashes, middle_offsets = middle
+        order = np.argsort(hashes, kind="stable")
+        middle_order = np.argsort(middle_hashes, kind="stable")
+        start = (hashes[order], offsets[order])
+        middle = (middle_hashes[middle_order], middle_offsets[middle_order])
+
+        self.directory.mkdir(exist_ok=True)
+        path = self.directory / f"{Path(transcript_path).stem}.npz"
+        np.savez_compressed(
+            path,
+            hashes=start[0],
+            offsets=start[1],
+            middle_hashes=middle[0],
+            middle_offsets=middle[1],
+            transcript=np.array(str(transcript_path)),
+            url=np.array(url),
+        )
+
+        if self._entries is not None:
+            self._entries.append(((start, middle), str(transcript_path)))
+
+        return str(path)
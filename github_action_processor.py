@@ -1,71 +1,100 @@
+import asyncio
+import concurrent.futures
+import contextlib
 import os
 import re
 import json
 import sys
+import tempfile
+import threading
+import time
 from pathlib import Path
-from main import PodcastTranscriber
+from urllib.parse import urlparse
+from fingerprint import FINGERPRINT_SECONDS, FingerprintIndex, fingerprint_episode, middle_window
+from main import (
+    PodcastTranscriber, PCM_SAMPLE_BYTES, SAMPLING_RATE, LanguageCache, MemoryBudget, TranscriptSpill,
+    decode_to_pcm, iter_pcm_windows, language_windows, pcm_language_windows, read_pcm,
+    split_audio_sections
+)
+from postprocess_transcript import call_github_models, split_transcript_file, write_cleaned_file
+from word_index import build_word_index, word_index_path
 
 
-def process_github_issue():
-    """Process GitHub issue and extract form data."""
-    # Get issue data from GitHub context
-    issue_body = os.environ.get('ISSUE_BODY', '')
-    issue_title = os.environ.get('ISSUE_TITLE', '')
-    
-    print(f"Processing issue: {issue_title}")
-    print(f"Issue body: {issue_body}")
-    
-    # Parse the issue body to extract form data
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.ogg', '.flac', '.aac')
+
+
+def parse_issue_body(issue_body: str, issue_title: str = "") -> tuple:
+    """Extract (title, url, content) from an issue form body in a single pass."""
     # The issue body contains the form data in a specific format
     title = ""
     url = ""
-    content = ""
-    
-    # Extract title, url, and content from the structured issue body
-    lines = issue_body.split('\n')
+    content_lines = []
     current_section = None
     
-    for line in lines:
+    for line in issue_body.split('\n'):
         line = line.strip()
-        if line.startswith('### Title'):
-            current_section = 'title'
-            continue
-        elif line.startswith('### Audio URL'):
-            current_section = 'url'
-            continue
-        elif line.startswith('### Content'):
-            current_section = 'content'
-            continue
-        elif line.startswith('###'):
-            current_section = None
+        if line.startswith('###'):
+            if line.startswith('### Title'):
+                current_section = 'title'
+            elif line.startswith('### Audio URL'):
+                current_section = 'url'
+            elif line.startswith('### Content'):
+                current_section = 'content'
+            else:
+                current_section = None
             continue
         
-        if current_section == 'title' and line:
+        if not line:
+            continue
+        if current_section == 'title':
             title = line
-        elif current_section == 'url' and line:
+        elif current_section == 'url':
             url = line
-        elif current_section == 'content' and line:
-            if content:
-                content += '\n' + line
-            else:
-                content = line
+        elif current_section == 'content':
+            content_lines.append(line)
     
     if not title:
         title = issue_title.replace('[Transcription] ', '')
     
-    return title, url, content
+    return title, url, '\n'.join(content_lines)
+
+
+def is_audio_url(url: str) -> bool:
+    """Check whether a URL's path ends in a known audio file extension."""
+    return urlparse(url).path.lower().endswith(AUDIO_EXTENSIONS)
 
 
-def create_transcript_file(title: str, content: str, transcript: str) -> str:
-    """Create a markdown file with the transcript."""
+def process_github_issue():
+    """Process GitHub issue and extract form data."""
+    # Get issue data from GitHub context
+    issue_body = os.environ.get('ISSUE_BODY', '')
+    issue_title = os.environ.get('ISSUE_TITLE', '')
+    
+    print(f"Processing issue: {issue_title}")
+    print(f"Issue body: {issue_body}")
+    
+    return parse_issue_body(issue_body, issue_title)
+
+
+def slugify(title: str) -> str:
+    """Turn a title into a lowercase, dash-separated file name."""
+    filename = re.sub(r'[^\w\s-]', '', title)
+    filename = re.sub(r'[-\s]+', '-', filename)
+    return filename.strip('-').lower()
+
+
+def create_transcript_file(title: str, content: str, transcript: str, filename: str = None) -> str:
+    """Create a markdown file with the transcript.
+    
+    The file name is derived from the title unless filename (without the
+    .md extension) is given.
+    """
     # Create transcripts directory if it doesn't exist
     transcripts_dir = Path("transcripts")
     transcripts_dir.mkdir(exist_ok=True)
     
     # Create filename from title
-    filename = re.sub(r'[^\w\s-]', '', title)
-    filename = re.sub(r'[-\s]+', '-', filename)
-    filename = filename.strip('-').lower()
+    filename = filename or slugify(title)
     
     if not filename:
         filename = "transcript"
@@ -95,6 +124,193 @@ def create_transcript_file(title: str, content: str, transcript: str) -> str:
     return str(filepath)
 
 
+def _run_in_daemon_thread(func, *args) -> concurrent.futures.Future:
+    """Start func in a daemon thread and return a future for its result."""
+    future = concurrent.futures.Future()
+    
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+async def _timed(timings: dict, stage: str, func, *args, daemon: bool = False):
+    """Run a blocking function in a worker thread and record its start/end times.
+    
+    A thread cannot be stopped, and asyncio.run waits for the default executor.
+    With daemon, the function runs outside that executor instead, so a
+    cancelled call is left behind without anything waiting for it.
+    """
+    start = time.perf_counter()
+    try:
+        if daemon:
+            return await asyncio.wrap_future(_run_in_daemon_thread(func, *args))
+        return await asyncio.to_thread(func, *args)
+    finally:
+        timings[stage] = (start, time.perf_counter())
+
+
+async def transcribe_pipeline(transcriber, url: str, cleanup: bool = False):
+    """Download, decode, transcribe and optionally clean up one episode.
+    
+    The model load runs concurrently with the download and decode, and each
+    transcribed section is handed to the GitHub Models cleanup while the next
+    section is still being transcribed. If the transcriber has a fingerprint
+    index, a re-hosted copy of an episode we already have is detected from a
+    partial download while the model loads, and the full download resumes
+    from that partial download when there is no match. With a
+    memory budget, audio is decoded to disk and transcribed window by window.
+    The language is detected once from a few sampled windows and fixed for
+    every section.
+    
+    Returns (transcript, cleaned_transcript, timings); cleaned_transcript is
+    None when cleanup is disabled.
+    """
+    timings = {"pipeline": (time.perf_counter(), None)}
+    bounded = bool(transcriber.memory_budget_mb)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        audio_path = os.path.join(temp_dir, "podcast_audio.mp3")
+        pcm_path = os.path.join(temp_dir, "podcast_audio.pcm")
+        
+        # Model load and download are independent, start both right away; the
+        # duplicate lookup is part of the download side
+        load_task = asyncio.create_task(_timed(timings, "model_load", transcriber.load_episode_model, url, daemon=True))
+        
+        # The prefix goes straight into audio_path so the full download resumes from it
+        existing = await _timed(timings, "fingerprint", transcriber.find_duplicate, url, temp_dir, audio_path)
+        if existing:
+            # The load thread finishes unused in the background; nothing waits for it
+            load_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await load_task
+            timings.pop("model_load", None)
+            transcript = transcriber.load_existing_transcript(existing)
+            transcriber.last_words = []
+            timings["pipeline"] = (timings["pipeline"][0], time.perf_counter())
+            return transcript, None, timings
+        
+        downloaded = await _timed(timings, "download", transcriber.download_audio, url, audio_path, True)
+        if not downloaded:
+            await load_task
+            timings["pipeline"] = (timings["pipeline"][0], time.perf_counter())
+            return "", None, timings
+        
+        if bounded:
+            # Decode to disk; windows are read back one at a time
+            await _timed(timings, "decode", decode_to_pcm, audio_path, pcm_path)
+            first, count = middle_window(os.path.getsize(pcm_path) // PCM_SAMPLE_BYTES)
+            start_audio = read_pcm(pcm_path, 0, FINGERPRINT_SECONDS * SAMPLING_RATE)
+            middle_audio = read_pcm(pcm_path, first, count)
+        else:
+            audio = await _timed(timings, "decode", transcriber.load_audio, audio_path)
+            first, count = middle_window(len(audio))
+            start_audio, middle_audio = audio, audio[first:first + count]
+        
+        if transcriber.fingerprint_index is not None:
+            # Fingerprint the decoded audio (the partial downloads may have been
+            # too short or undecodable) so the episode can be added to the index
+            transcriber.last_fingerprint = await _timed(
+                timings, "fingerprint_full", fingerprint_episode, start_audio, middle_audio, SAMPLING_RATE
+            )
+        del start_audio, middle_audio
+        
+        await load_task
+        
+        windows = pcm_language_windows(pcm_path) if bounded else language_windows(audio)
+        await _timed(timings, "language", transcriber.detect_episode_language, windows, url)
+        del windows
+        
+        if bounded:
+            budget = MemoryBudget(transcriber.memory_budget_mb)
+            budget.plan()
+            sections = iter_pcm_windows(pcm_path, budget)
+            # Finished text goes to disk instead of accumulating in memory
+            texts = TranscriptSpill(os.path.join(temp_dir, "transcript.jsonl"))
+        else:
+            sections = ((start, end, audio[start:end]) for start, end in split_audio_sections(audio, SAMPLING_RATE))
+            texts = []
+        
+        cleanup_tasks = []
+        words = []
+        i = 0
+        while True:
+            # Reading the next window may touch the disk, keep it off the event loop
+            section = await asyncio.to_thread(next, sections, None)
+            if section is None:
+                break
+            
+            start, end, samples = section
+            del section
+            text = await _timed(
+                timings, f"transcribe_{i}", transcriber.transcribe_array, samples, SAMPLING_RATE, start / SAMPLING_RATE
+            )
+            words.extend(transcriber.last_words)
+            del samples
+            
+            if bounded:
+                texts.append(text, start, end)
+            else:
+                texts.append(text)
+            if cleanup and text:
+                cleanup_tasks.append(asyncio.create_task(_timed(timings, f"cleanup_{i}", call_github_models, text)))
+            i += 1
+        
+        raw_sections = [text for text in texts if text]
+    
+    # Word timestamps of the whole episode, for building its word index
+    transcriber.last_words = words
+    print(f"Transcribed {i} section(s)")
+    transcript = "\n\n".join(raw_sections)
+    cleaned_transcript = None
+    
+    if cleanup:
+        cleaned_sections = await asyncio.gather(*cleanup_tasks)
+        # Fall back to the raw text for any section the API failed to clean
+        cleaned_transcript = "\n\n".join(
+            cleaned or raw for cleaned, raw in zip(cleaned_sections, raw_sections)
+        )
+    
+    timings["pipeline"] = (timings["pipeline"][0], time.perf_counter())
+    return transcript, cleaned_transcript, timings
+
+
+def report_timings(timings: dict):
+    """Print per-stage timings and the critical path of a pipeline run."""
+    origin, finish = timings["pipeline"]
+    
+    print("Pipeline timings:")
+    for stage, (start, end) in sorted(timings.items(), key=lambda item: item[1][0]):
+        if stage != "pipeline":
+            print(f"  {stage:<16} {start - origin:8.2f}s -> {end - origin:8.2f}s  ({end - start:.2f}s)")
+    
+    def duration(stage):
+        start, end = timings.get(stage, (0.0, 0.0))
+        return end - start
+    
+    # Everything before the first section starts is bounded by the slower of
+    # model load and lookup + download + decode, which run side by side
+    load = duration("model_load")
+    language = duration("language")
+    fetch = duration("fingerprint") + duration("download") + duration("decode") + duration("fingerprint_full")
+    transcribe = sum(end - start for stage, (start, end) in timings.items() if stage.startswith("transcribe_"))
+    transcribe_end = max(
+        (end for stage, (_, end) in timings.items() if stage.startswith("transcribe_")),
+        default=finish
+    )
+    
+    print(f"  Model load / download overlap saved {min(load, fetch):.2f}s")
+    print(f"  Critical path: max(load {load:.2f}s, lookup+download+decode {fetch:.2f}s)"
+          f" + language {language:.2f}s + transcribe {transcribe:.2f}s + cleanup tail {finish - transcribe_end:.2f}s")
+    print(f"  Wall time: {finish - origin:.2f}s")
+
+
 def main():
     """Main function for GitHub Action processing."""
     try:
@@ -111,18 +327,31 @@ def main():
         print(f"  Content: {content[:100]}..." if content else "  Content: (empty)")
         
         # Validate the URL is an audio file
-        audio_extensions = ['.mp3', '.wav', '.m4a', '.ogg', '.flac', '.aac']
-        url_lower = url.lower()
-        
-        if not any(ext in url_lower for ext in audio_extensions):
+        if not is_audio_url(url):
             print(f"Warning: URL may not be an audio file: {url}")
         
-        # Initialize transcriber
-        transcriber = PodcastTranscriber()
+        # Defer the model load so it overlaps with the download
+        fingerprint_index = FingerprintIndex()
+        # Optional resident memory target for very long recordings; windows are
+        # sized to stay under it, but nothing enforces it
+        memory_budget_mb = os.environ.get('MEMORY_BUDGET_MB')
+        transcriber = PodcastTranscriber(
+            load_model=False,
+            fingerprint_index=fingerprint_index,
+            memory_budget_mb=float(memory_budget_mb) if memory_budget_mb else None,
+            word_timestamps=os.environ.get('WORD_TIMESTAMPS', '').lower() in ('1', 'true', 'yes'),
+            language_cache=LanguageCache()
+        )
+        
+        # Clean up sections with GitHub Models while transcription runs
+        cleanup = bool(os.environ.get('GITHUB_TOKEN'))
         
         # Transcribe audio
         print(f"Transcribing: {url}")
-        transcript = transcriber.transcribe_from_url(url)
+        transcript, cleaned_transcript, timings = asyncio.run(
+            transcribe_pipeline(transcriber, url, cleanup=cleanup)
+        )
+        report_timings(timings)
         
         if not transcript:
             print("Error: Failed to transcribe audio")
@@ -132,16 +361,35 @@ def main():
         filepath = create_transcript_file(title, content, transcript)
         print(f"Transcript saved to: {filepath}")
         
+        if transcriber.last_fingerprint is not None:
+            fingerprint_file = fingerprint_index.add(transcriber.last_fingerprint, filepath, url)
+            print(f"Fingerprint saved to: {fingerprint_file}")
+        
+        if transcriber.last_words:
+            index_dir = build_word_index(transcriber.last_words, word_index_path(filepath))
+            print(f"Word index saved to: {index_dir}")
+        
+        cleaned_file = None
+        if cleaned_transcript:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                header_content, _ = split_transcript_file(f.read())
+            cleaned_file = write_cleaned_file(filepath, header_content, cleaned_transcript)
+            print(f"Cleaned transcript saved to: {cleaned_file}")
+        
         # Set output for GitHub Actions using environment file
         github_output = os.environ.get('GITHUB_OUTPUT')
         if github_output:
             with open(github_output, 'a') as f:
                 f.write(f"transcript_file={filepath}\n")
                 f.write(f"title={title}\n")
+                if cleaned_file:
+                    f.write(f"cleaned_file={cleaned_file}\n")
         else:
             # Fallback to deprecated method for backwards compatibility
             print(f"::set-output name=transcript_file::{filepath}")
             print(f"::set-output name=title::{title}")
+            if cleaned_file:
+                print(f"::set-output name=cleaned_file::{cleaned_file}")
         
     except Exception as e:
         print(f"Error processing issue: {e}")
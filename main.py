@@ -1,36 +1,550 @@
+import ctypes
+import ctypes.util
+import gc
+import hashlib
+import json
 import os
+import subprocess
 import sys
 import requests
 import tempfile
+import threading
+import time
+from collections import Counter
 from pathlib import Path
-from transformers import pipeline
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+import librosa
+import numpy as np
+from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
 import torch
+from fingerprint import FINGERPRINT_SECONDS, PREFIX_BYTES, FingerprintIndex, fingerprint_episode, middle_window
+from postprocess_transcript import split_transcript_file
+
+
+MODEL_ID = "openai/whisper-tiny"
+
+# Whisper models expect 16 kHz mono input
+SAMPLING_RATE = 16000
+
+# Memory-bounded mode decodes to 16-bit PCM on disk and reads it in windows
+PCM_SAMPLE_BYTES = 2
+MIN_WINDOW_S = 60
+MAX_WINDOW_S = 600
+# Lower bound on the peak cost of one window sample (the float32 copy handed
+# to the pipeline plus its padded/normalised copies); the real cost is
+# measured on every window
+WINDOW_BYTES_PER_SAMPLE = 16
+# Room for the per-chunk log-mel features, decoder state and allocator slack
+BUDGET_SAFETY_MB = 256
+
+# Language detection looks at a few 30s windows spread through the episode
+LANGUAGE_SAMPLES = 3
+LANGUAGE_WINDOW_S = 30
+# Local and gitignored: a shared file committed by every transcription pull
+# request would make concurrent pull requests conflict
+LANGUAGE_CACHE_FILE = Path(".cache") / "languages.json"
+
+_libc_name = ctypes.util.find_library("c")
+_libc = ctypes.CDLL(_libc_name) if _libc_name and sys.platform.startswith("linux") else None
+
+
+def quietest_point(audio, sampling_rate: int = SAMPLING_RATE) -> int:
+    """Return the sample index at the centre of the quietest 20 ms frame."""
+    frame = max(1, int(0.02 * sampling_rate))
+    window = np.asarray(audio, dtype=np.float32)
+    frames = window[:len(window) // frame * frame].reshape(-1, frame)
+    energy = np.square(frames).mean(axis=1)
+    return int(np.argmin(energy)) * frame + frame // 2
+
+
+def split_audio_sections(audio, sampling_rate: int = SAMPLING_RATE, section_s: float = 300, search_s: float = 5) -> list:
+    """Split decoded audio into (start, end) sample ranges of roughly section_s seconds.
+
+    Each boundary is moved to the quietest 20 ms frame within search_s seconds of
+    the target position so that sections are not cut in the middle of a word.
+    """
+    total = len(audio)
+    section = int(section_s * sampling_rate)
+    search = int(search_s * sampling_rate)
+    
+    sections = []
+    start = 0
+    while total - start > section + search:
+        # Look for the quietest frame around the target boundary
+        lo = start + section - search
+        boundary = lo + quietest_point(audio[lo:start + section + search], sampling_rate)
+        sections.append((start, boundary))
+        start = boundary
+    
+    sections.append((start, total))
+    return sections
+
+
+def decode_to_pcm(audio_path: str, pcm_path: str, sampling_rate: int = SAMPLING_RATE,
+                  start_s: float = None, duration_s: float = None):
+    """Decode an audio file to raw 16-bit mono PCM on disk with ffmpeg.
+    
+    ffmpeg streams the conversion, so the decoded audio never has to fit in
+    memory no matter how long the recording is. start_s and duration_s
+    decode only that range, seeking in the input instead of decoding up to it.
+    """
+    seek = []
+    if start_s:
+        seek += ["-ss", f"{start_s:.3f}"]
+    if duration_s is not None:
+        seek += ["-t", f"{duration_s:.3f}"]
+    
+    subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-y", *seek, "-i", audio_path,
+         "-ac", "1", "-ar", str(sampling_rate), "-f", "s16le", pcm_path],
+        check=True
+    )
+
+
+def probe_duration(audio_path: str) -> float:
+    """Duration of an audio file in seconds, read from its container with ffprobe."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", audio_path],
+        check=True, capture_output=True, text=True
+    )
+    return float(result.stdout.strip())
+
+
+def read_pcm(pcm_path: str, start: int, count: int):
+    """Read count samples starting at start from a raw 16-bit PCM file as float32."""
+    with open(pcm_path, 'rb') as f:
+        f.seek(start * PCM_SAMPLE_BYTES)
+        samples = np.fromfile(f, dtype=np.int16, count=count)
+    return samples.astype(np.float32) / 32768.0
+
+
+def iter_pcm_windows(pcm_path: str, budget, sampling_rate: int = SAMPLING_RATE, search_s: float = 5):
+    """Yield (start, end, audio) windows read from a raw PCM file one at a time.
+    
+    The window length comes from budget.window_s and is re-read for every
+    window, so the budget can resize it from what each window really cost.
+    Boundaries are placed at the quietest point near the end of each window.
+    """
+    total = os.path.getsize(pcm_path) // PCM_SAMPLE_BYTES
+    search = int(search_s * sampling_rate)
+    
+    try:
+        yield from _pcm_windows(pcm_path, budget, total, search, sampling_rate)
+    finally:
+        budget.close()
+
+
+def _pcm_windows(pcm_path: str, budget, total: int, search: int, sampling_rate: int):
+    start = 0
+    while start < total:
+        end = min(total, start + int(budget.window_s * sampling_rate))
+        if total - end > search:
+            # Read a little past the target end so the cut can move to a pause
+            audio = read_pcm(pcm_path, start, end + search - start)
+            end = end - search + quietest_point(audio[end - search - start:], sampling_rate)
+            audio = audio[:end - start]
+        else:
+            end = total
+            audio = read_pcm(pcm_path, start, end - start)
+        
+        yield start, end, audio
+        
+        # The caller is done with this window, drop it before reading the next
+        del audio
+        budget.release(end - start)
+        start = end
+
+
+def language_sample_starts(total_samples: int, count: int = LANGUAGE_SAMPLES,
+                           sampling_rate: int = SAMPLING_RATE) -> list:
+    """Start samples of `count` detection windows spread evenly through an episode.
+    
+    Windows are centred at 1/(count+1), 2/(count+1), ... of the episode, which
+    keeps them clear of intro music and outros.
+    """
+    window = LANGUAGE_WINDOW_S * sampling_rate
+    if total_samples <= window:
+        return [0]
+    
+    starts = {
+        min(total_samples - window, max(0, total_samples * (i + 1) // (count + 1) - window // 2))
+        for i in range(count)
+    }
+    return sorted(starts)
+
+
+def language_windows(audio, sampling_rate: int = SAMPLING_RATE) -> list:
+    """Sample language detection windows from decoded audio."""
+    window = LANGUAGE_WINDOW_S * sampling_rate
+    return [audio[start:start + window] for start in language_sample_starts(len(audio), sampling_rate=sampling_rate)]
+
+
+def pcm_language_windows(pcm_path: str, sampling_rate: int = SAMPLING_RATE) -> list:
+    """Sample language detection windows from a PCM file without reading all of it."""
+    window = LANGUAGE_WINDOW_S * sampling_rate
+    total = os.path.getsize(pcm_path) // PCM_SAMPLE_BYTES
+    return [read_pcm(pcm_path, start, window) for start in language_sample_starts(total, sampling_rate=sampling_rate)]
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # No /proc (e.g. macOS): fall back to the peak, which over-estimates
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+class MemoryBudget:
+    """Sizes audio windows so transcription stays under a resident memory budget.
+    
+    The budget is met by measurement, not enforced by the OS: the first
+    window is the smallest allowed, resident memory is sampled while each
+    window is transcribed, and the next window is sized from the measured
+    cost per sample. A budget can still be overshot if one window costs far
+    more than the one before it.
+    """
+    
+    def __init__(self, budget_mb: float, sample_interval_s: float = 0.01):
+        self.budget_mb = budget_mb
+        self.window_s = MIN_WINDOW_S
+        self.bytes_per_sample = WINDOW_BYTES_PER_SAMPLE
+        # Highest resident memory seen while processing windows
+        self.peak_mb = 0.0
+        self._sample_interval_s = sample_interval_s
+        self._sampling = False
+        self._window_baseline_mb = 0.0
+        self._window_peak_mb = 0.0
+        self._window_maxrss_mb = 0.0
+    
+    def plan(self):
+        """Check the budget leaves room for a window once the model is loaded."""
+        self._trim()
+        baseline_mb = current_rss_mb()
+        headroom_mb = self.budget_mb - baseline_mb - BUDGET_SAFETY_MB
+        
+        if self._window_mb(MIN_WINDOW_S) > headroom_mb:
+            raise MemoryError(
+                f"Memory budget of {self.budget_mb:.0f} MB is too small: the process already uses "
+                f"{baseline_mb:.0f} MB and a {MIN_WINDOW_S}s window needs "
+                f"{self._window_mb(MIN_WINDOW_S) + BUDGET_SAFETY_MB:.0f} MB more"
+            )
+        
+        self.window_s = MIN_WINDOW_S
+        self._start_window(baseline_mb)
+        if not self._sampling:
+            self._sampling = True
+            threading.Thread(target=self._sample, daemon=True).start()
+        print(f"Memory budget {self.budget_mb:.0f} MB, {baseline_mb:.0f} MB in use: "
+              f"starting with {self.window_s:.0f}s windows")
+    
+    def release(self, samples: int = 0):
+        """Free the finished window and size the next one from its measured peak."""
+        self._trim()
+        window_peak_mb = self._window_peak_mb
+        maxrss_mb = peak_rss_mb()
+        if maxrss_mb > self._window_maxrss_mb:
+            # A new lifetime high was reached during this window: that is its exact peak
+            window_peak_mb = max(window_peak_mb, maxrss_mb)
+        self.peak_mb = max(self.peak_mb, window_peak_mb)
+        
+        if window_peak_mb > self.budget_mb:
+            print(f"Warning: peak memory {window_peak_mb:.0f} MB exceeded the budget of {self.budget_mb:.0f} MB")
+        
+        if samples:
+            measured = (window_peak_mb - self._window_baseline_mb) * 2**20 / samples
+            self.bytes_per_sample = max(WINDOW_BYTES_PER_SAMPLE, measured)
+        
+        baseline_mb = current_rss_mb()
+        headroom_mb = self.budget_mb - baseline_mb - BUDGET_SAFETY_MB
+        window_s = headroom_mb * 2**20 / self.bytes_per_sample / SAMPLING_RATE
+        # Grow at most twofold per window in case the cost is not linear in length
+        self.window_s = max(MIN_WINDOW_S, min(MAX_WINDOW_S, 2 * self.window_s, window_s))
+        self._start_window(baseline_mb)
+    
+    def close(self):
+        """Stop sampling resident memory."""
+        self._sampling = False
+    
+    def _window_mb(self, window_s: float) -> float:
+        return window_s * SAMPLING_RATE * self.bytes_per_sample / 2**20
+    
+    def _start_window(self, baseline_mb: float):
+        self._window_baseline_mb = baseline_mb
+        self._window_peak_mb = baseline_mb
+        self._window_maxrss_mb = peak_rss_mb()
+    
+    def _sample(self):
+        while self._sampling:
+            self._window_peak_mb = max(self._window_peak_mb, current_rss_mb())
+            time.sleep(self._sample_interval_s)
+    
+    @staticmethod
+    def _trim():
+        """Return freed memory to the OS."""
+        gc.collect()
+        if _libc is not None:
+            # glibc keeps freed heap pages mapped unless asked to trim them
+            _libc.malloc_trim(0)
+
+
+class TranscriptSpill:
+    """Append-only transcript store on disk, one JSON line per window."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        open(self.path, 'w', encoding='utf-8').close()
+    
+    def append(self, text: str, start: int = 0, end: int = 0):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"start": start, "end": end, "text": text}) + "\n")
+    
+    def __iter__(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)["text"]
+
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write data as JSON through a temporary file, so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(temp_path, path)
+
+
+class LanguageCache:
+    """Detected language of each episode, keyed by a hash of its audio URL.
+    
+    It only helps when the same URL is transcribed again, e.g. a retried run
+    or a repeated feed back-fill on the same machine.
+    """
+    
+    def __init__(self, path=LANGUAGE_CACHE_FILE):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+    
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+    
+    def get(self, url: str) -> str:
+        return self.entries.get(self.key(url))
+    
+    def set(self, url: str, language: str):
+        """Record a language and write the cache atomically."""
+        self.entries[self.key(url)] = language
+        write_json_atomic(self.path, self.entries, indent=2, sort_keys=True)
 
 
 class PodcastTranscriber:
-    def __init__(self):
-        """Initialize the transcriber with whisper-small model."""
+    def __init__(self, load_model: bool = True, fingerprint_index: FingerprintIndex = None,
+                 memory_budget_mb: float = None, word_timestamps: bool = False,
+                 model_path: str = None, offline: bool = None, language: str = None,
+                 english_model: str = None, language_cache: LanguageCache = None):
+        """Initialize the transcriber with whisper-small model.
+        
+        Pass load_model=False to defer building the pipeline until
+        load_episode_model() is called, e.g. so it can run while the audio is
+        still downloading.
+        With a fingerprint_index, episodes that were already transcribed under
+        another URL are recognised from a partial download and reused.
+        With memory_budget_mb, audio is decoded to disk and transcribed in
+        windows sized to keep the process under that resident memory budget.
+        With word_timestamps, the (start, end, word) tuples of the last
+        transcription are kept in last_words for building a word index.
+        model_path points at a local snapshot made by model_snapshot.py, and
+        offline forbids any Hugging Face Hub access; they default to the
+        WHISPER_MODEL_PATH and WHISPER_OFFLINE environment variables.
+        The language of each episode is detected once from a few sampled
+        windows (or forced with language / WHISPER_LANGUAGE) and passed to
+        every chunk; english_model / WHISPER_ENGLISH_MODEL names an
+        English-only variant used for English episodes, and language_cache
+        remembers the decision per episode URL.
+        """
         # Check if CUDA is available, otherwise use CPU
-        device = 0 if torch.cuda.is_available() else "cpu"
+        self.device = 0 if torch.cuda.is_available() else "cpu"
+        self.transcriber = None
+        self.fingerprint_index = fingerprint_index
+        # Fingerprint of the last episode looked up, for adding to the index
+        self.last_fingerprint = None
+        self.memory_budget_mb = memory_budget_mb
+        self.word_timestamps = word_timestamps
+        self.last_words = []
+        self.model_path = model_path or os.environ.get("WHISPER_MODEL_PATH") or None
+        if offline is None:
+            offline = os.environ.get("WHISPER_OFFLINE", "").lower() in ("1", "true", "yes")
+        self.offline = offline
+        self.language = language or os.environ.get("WHISPER_LANGUAGE") or None
+        self.english_model = english_model or os.environ.get("WHISPER_ENGLISH_MODEL") or None
+        self.english_transcriber = None
+        self.language_cache = language_cache
+        # Language fixed for the current episode, passed to every chunk
+        self.episode_language = self.language
         
-        print(f"Using device: {device}")
+        print(f"Using device: {self.device}")
         
-        # Initialize the whisper pipeline
-        self.transcriber = pipeline(
+        if load_model:
+            self.load_episode_model()
+    
+    def load_model(self):
+        """Build the whisper pipeline from the Hub or a local snapshot."""
+        self.transcriber = self._build_pipeline(self.model_path or MODEL_ID)
+    
+    def load_english_model(self):
+        """Build the English-only pipeline, if it is not loaded yet."""
+        if self.english_transcriber is None:
+            self.english_transcriber = self._build_pipeline(self.english_model)
+    
+    def load_episode_model(self, cache_key: str = None):
+        """Load the pipeline an episode will run on, as far as it is known up front.
+        
+        A forced or cached English language with an English-only model
+        configured needs only that model; otherwise the multilingual model is
+        needed, for detection if not for transcription.
+        """
+        if self.known_language(cache_key) == "en" and self.english_model:
+            self.load_english_model()
+        elif self.transcriber is None:
+            self.load_model()
+    
+    def _build_pipeline(self, source: str):
+        """Load a model and processor from a Hub ID or local path into a pipeline."""
+        start = time.perf_counter()
+        torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+        
+        # safetensors weights are memory-mapped, so a local snapshot loads at
+        # close to the cost of mapping the file; local_files_only keeps
+        # offline runs from ever touching the network
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(
+            source,
+            torch_dtype=torch_dtype,
+            use_safetensors=True,
+            low_cpu_mem_usage=True,
+            local_files_only=self.offline
+        )
+        processor = AutoProcessor.from_pretrained(source, local_files_only=self.offline)
+        
+        asr = pipeline(
             "automatic-speech-recognition",
-            model="openai/whisper-tiny",
-            device=device,
-            torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            device=self.device,
+            torch_dtype=torch_dtype
         )
+        print(f"Loaded {source} in {time.perf_counter() - start:.2f}s")
+        return asr
     
-    def download_audio(self, url: str, output_path: str) -> bool:
-        """Download audio file from URL."""
+    def known_language(self, cache_key: str = None) -> str:
+        """The forced or cached language of an episode, or None if it must be detected."""
+        if self.language:
+            return self.language
+        if cache_key and self.language_cache is not None:
+            return self.language_cache.get(cache_key)
+        return None
+    
+    def detect_episode_language(self, windows: list, cache_key: str = None) -> str:
+        """Fix the language of the current episode from a few sampled windows.
+        
+        Each window costs one encoder pass and a single decoder step, and the
+        majority vote is used for every chunk, so Whisper no longer detects
+        (and sometimes switches) the language chunk by chunk.
+        """
+        known = self.known_language(cache_key)
+        if known:
+            if known != self.language:
+                print(f"Using cached language: {known}")
+            self.episode_language = known
+            return known
+        
+        self.episode_language = None
+        windows = [window for window in windows if len(window)]
+        if not windows:
+            return None
+        
+        if self.transcriber is None:
+            self.load_model()
+        
+        model = self.transcriber.model
+        if not getattr(model.generation_config, "is_multilingual", True):
+            # English-only models have no language tokens to detect
+            self.episode_language = "en"
+            return "en"
+        
+        features = self.transcriber.feature_extractor(
+            [np.asarray(window, dtype=np.float32) for window in windows],
+            sampling_rate=SAMPLING_RATE,
+            return_tensors="pt"
+        ).input_features.to(model.device, dtype=model.dtype)
+        language_ids = model.detect_language(features)
+        
+        votes = Counter(self.transcriber.tokenizer.convert_ids_to_tokens(language_ids.tolist()))
+        token, count = votes.most_common(1)[0]
+        language = token.strip("<|>")
+        print(f"Detected language: {language} ({count}/{len(windows)} windows)")
+        
+        if cache_key and self.language_cache is not None:
+            self.language_cache.set(cache_key, language)
+        
+        self.episode_language = language
+        return language
+    
+    def active_transcriber(self):
+        """The pipeline for the current episode: the English-only variant for English, if configured."""
+        if self.episode_language == "en" and self.english_model:
+            self.load_english_model()
+            return self.english_transcriber
+        
+        if self.transcriber is None:
+            self.load_model()
+        return self.transcriber
+    
+    def generate_kwargs(self, transcriber) -> dict:
+        """Language and task for every chunk; English-only models take neither."""
+        if not self.episode_language or not getattr(transcriber.model.generation_config, "is_multilingual", True):
+            return {}
+        return {"language": self.episode_language, "task": "transcribe"}
+    
+    def download_audio(self, url: str, output_path: str, resume: bool = False) -> bool:
+        """Download audio file from URL.
+        
+        With resume, bytes already in output_path (e.g. the prefix fetched for
+        fingerprinting) are kept and only the rest is requested.
+        """
         try:
             print(f"Downloading audio from: {url}")
-            response = requests.get(url, stream=True)
+            have = os.path.getsize(output_path) if resume and os.path.exists(output_path) else 0
+            headers = {"Range": f"bytes={have}-"} if have else {}
+            response = requests.get(url, stream=True, headers=headers)
+            if have and response.status_code == 416:
+                # The prefix already was the whole file
+                response.close()
+                print(f"Audio downloaded to: {output_path}")
+                return True
             response.raise_for_status()
             
-            with open(output_path, 'wb') as f:
+            # A server that ignores the Range header sends the whole file again
+            mode = 'ab' if have and response.status_code == 206 else 'wb'
+            with open(output_path, mode) as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     f.write(chunk)
             
@@ -40,18 +554,148 @@ class PodcastTranscriber:
             print(f"Error downloading audio: {e}")
             return False
     
-    def transcribe_audio(self, audio_path: str) -> str:
-        """Transcribe audio file using whisper-small model."""
+    def download_audio_prefix(self, url: str, output_path: str, max_bytes: int = PREFIX_BYTES) -> bool:
+        """Download only the first max_bytes of an audio file."""
+        return self.download_audio_range(url, output_path, 0, max_bytes) is not None
+    
+    def download_audio_range(self, url: str, output_path: str, start: int, max_bytes: int):
+        """Download max_bytes of an audio file starting at byte `start`.
+        
+        Returns the total size of the file (0 if the server did not report
+        it), or None if the download failed.
+        """
+        try:
+            # Servers that ignore the Range header are cut off after max_bytes
+            response = requests.get(url, stream=True, headers={"Range": f"bytes={start}-{start + max_bytes - 1}"})
+            response.raise_for_status()
+            if start and response.status_code != 206:
+                # The body would be the start of the file, not the requested range
+                response.close()
+                print("Server does not support Range requests")
+                return None
+            
+            if response.status_code == 206:
+                total = response.headers.get("Content-Range", "").rpartition("/")[2]
+            else:
+                total = response.headers.get("Content-Length", "")
+            
+            written = 0
+            with open(output_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk[:max_bytes - written])
+                    written += len(chunk)
+                    if written >= max_bytes:
+                        break
+            response.close()
+            
+            return int(total) if total.isdigit() else 0
+        except Exception as e:
+            print(f"Error downloading part of audio: {e}")
+            return None
+    
+    def fingerprint_url(self, url: str, temp_dir: str, prefix_path: str = None):
+        """Fingerprint the start and middle of an episode from two partial downloads.
+        
+        The prefix is written to prefix_path (a temporary file by default),
+        so passing the final audio path lets download_audio resume from it.
+        Returns (start, middle) as for fingerprint_episode, with middle None
+        if the middle could not be fetched or decoded, or None if the start
+        could not be decoded.
+        """
+        prefix_path = prefix_path or os.path.join(temp_dir, "podcast_prefix.mp3")
+        total_bytes = self.download_audio_range(url, prefix_path, 0, PREFIX_BYTES)
+        if total_bytes is None:
+            return None
+        
+        try:
+            start_audio, _ = librosa.load(prefix_path, sr=SAMPLING_RATE, mono=True, duration=FINGERPRINT_SECONDS)
+        except Exception as e:
+            # Some containers (e.g. m4a with a trailing index) cannot be decoded partially
+            print(f"Could not fingerprint partial download: {e}")
+            return None
+        
+        return fingerprint_episode(start_audio, self.download_middle(url, temp_dir, total_bytes, prefix_path), SAMPLING_RATE)
+    
+    def download_middle(self, url: str, temp_dir: str, total_bytes: int, prefix_path: str):
+        """Fetch and decode FINGERPRINT_SECONDS from the middle of an episode.
+        
+        The middle byte of the file is taken as the middle of the audio.
+        Returns None if the file size is unknown or the range cannot be
+        decoded on its own (e.g. WAV or m4a, unlike MP3).
+        """
+        if not total_bytes:
+            return None
+        
+        if total_bytes <= PREFIX_BYTES:
+            # The prefix already is the whole file
+            middle_path = prefix_path
+        else:
+            middle_path = os.path.join(temp_dir, "podcast_middle.mp3")
+            first = (total_bytes - PREFIX_BYTES) // 2
+            if self.download_audio_range(url, middle_path, first, PREFIX_BYTES) is None:
+                return None
+        
+        try:
+            audio, _ = librosa.load(middle_path, sr=SAMPLING_RATE, mono=True)
+        except Exception as e:
+            print(f"Could not fingerprint the middle of the episode: {e}")
+            return None
+        finally:
+            if middle_path != prefix_path:
+                os.remove(middle_path)
+        
+        first, count = middle_window(len(audio), SAMPLING_RATE)
+        return audio[first:first + count]
+    
+    def find_duplicate(self, url: str, temp_dir: str, prefix_path: str = None) -> str:
+        """Fingerprint the start and middle of an episode and look them up in the index.
+        
+        Returns the path of an existing transcript for the same audio, or None.
+        """
+        self.last_fingerprint = None
+        if self.fingerprint_index is None:
+            return None
+        
+        self.last_fingerprint = self.fingerprint_url(url, temp_dir, prefix_path)
+        if self.last_fingerprint is None:
+            return None
+        
+        return self.fingerprint_index.lookup(self.last_fingerprint)
+    
+    def load_existing_transcript(self, transcript_path: str) -> str:
+        """Read the transcript section of a previously generated transcript file."""
+        with open(transcript_path, 'r', encoding='utf-8') as f:
+            _, transcript = split_transcript_file(f.read())
+        
+        print(f"Reusing transcript from: {transcript_path}")
+        return transcript or ""
+    
+    def transcribe_audio(self, audio_path: str, cache_key: str = None) -> str:
+        """Transcribe audio file using whisper-small model.
+        
+        cache_key (usually the episode URL) keys the language cache.
+        """
+        self.last_words = []
         try:
             print(f"Starting transcription of: {audio_path}")
             
+            if self.memory_budget_mb:
+                return self.transcribe_bounded(audio_path, cache_key)
+            
+            # Only the pipeline(s) this episode needs are loaded, on first use
+            audio = self.load_audio(audio_path)
+            self.detect_episode_language(language_windows(audio), cache_key)
+            transcriber = self.active_transcriber()
+            
             # Use the pipeline with long-form transcription settings
-            result = self.transcriber(
-                audio_path,
+            result = transcriber(
+                {"raw": audio, "sampling_rate": SAMPLING_RATE},
                 chunk_length_s=30,  # Process in 30-second chunks
                 stride_length_s=5,  # 5-second overlap between chunks
-                return_timestamps=True
+                return_timestamps="word" if self.word_timestamps else True,
+                generate_kwargs=self.generate_kwargs(transcriber)
             )
+            self.last_words = self._words_from_result(result)
             
             return result["text"]
             
@@ -59,17 +703,91 @@ class PodcastTranscriber:
             print(f"Error transcribing audio: {e}")
             return ""
     
+    def load_audio(self, audio_path: str):
+        """Decode an audio file to 16 kHz mono float32 samples."""
+        print(f"Decoding audio: {audio_path}")
+        audio, _ = librosa.load(audio_path, sr=SAMPLING_RATE, mono=True)
+        return audio
+    
+    def transcribe_array(self, audio, sampling_rate: int = SAMPLING_RATE, offset_s: float = 0.0) -> str:
+        """Transcribe already decoded audio samples.
+        
+        offset_s is where the samples start within the episode, so that word
+        timestamps are relative to the whole episode. The language fixed by
+        the last detect_episode_language call is used.
+        """
+        transcriber = self.active_transcriber()
+        
+        result = transcriber(
+            {"raw": np.ascontiguousarray(audio, dtype=np.float32), "sampling_rate": sampling_rate},
+            chunk_length_s=30,
+            stride_length_s=5,
+            return_timestamps="word" if self.word_timestamps else True,
+            generate_kwargs=self.generate_kwargs(transcriber)
+        )
+        self.last_words = self._words_from_result(result, offset_s)
+        return result["text"].strip()
+    
+    def _words_from_result(self, result: dict, offset_s: float = 0.0) -> list:
+        """Extract (start, end, word) tuples from a word-timestamped pipeline result."""
+        if not self.word_timestamps:
+            return []
+        
+        words = []
+        for chunk in result.get("chunks", []):
+            start, end = chunk["timestamp"]
+            if start is None:
+                continue
+            # The final word of a chunk can come back without an end time
+            end = start if end is None else end
+            words.append((start + offset_s, end + offset_s, chunk["text"]))
+        
+        return words
+    
+    def transcribe_bounded(self, audio_path: str, cache_key: str = None) -> str:
+        """Transcribe a file window by window within the memory budget.
+        
+        The audio is decoded to PCM on disk, each window is read, transcribed
+        and freed before the next one, and finished text is spilled to disk.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pcm_path = os.path.join(temp_dir, "podcast_audio.pcm")
+            decode_to_pcm(audio_path, pcm_path)
+            
+            self.detect_episode_language(pcm_language_windows(pcm_path), cache_key)
+            
+            budget = MemoryBudget(self.memory_budget_mb)
+            budget.plan()
+            
+            spill = TranscriptSpill(os.path.join(temp_dir, "transcript.jsonl"))
+            words = []
+            for start, end, audio in iter_pcm_windows(pcm_path, budget):
+                print(f"Transcribing {start / SAMPLING_RATE:.0f}s - {end / SAMPLING_RATE:.0f}s")
+                spill.append(self.transcribe_array(audio, SAMPLING_RATE, start / SAMPLING_RATE), start, end)
+                words.extend(self.last_words)
+                # Drop our reference so the window can be freed before the next read
+                del audio
+            
+            self.last_words = words
+            return " ".join(text for text in spill if text)
+    
     def transcribe_from_url(self, url: str, output_file: str = None) -> str:
         """Download and transcribe audio from URL."""
         with tempfile.TemporaryDirectory() as temp_dir:
             # Download audio to temporary file
             audio_path = os.path.join(temp_dir, "podcast_audio.mp3")
             
-            if not self.download_audio(url, audio_path):
-                return ""
+            # Skip the full download for episodes we already transcribed
+            existing = self.find_duplicate(url, temp_dir, audio_path)
             
-            # Transcribe the audio
-            transcript = self.transcribe_audio(audio_path)
+            if existing:
+                transcript = self.load_existing_transcript(existing)
+                self.last_words = []
+            elif not self.download_audio(url, audio_path, resume=True):
+                return ""
+            else:
+                # Transcribe the audio
+                transcript = self.transcribe_audio(audio_path, url)
             
             # Save transcript if output file specified
             if output_file and transcript:
@@ -91,7 +809,10 @@ def main():
     output_file = sys.argv[2] if len(sys.argv) > 2 else None
     
     # Initialize transcriber
-    transcriber = PodcastTranscriber()
+    # The model is only loaded if the episode has not been transcribed before
+    transcriber = PodcastTranscriber(
+        load_model=False, fingerprint_index=FingerprintIndex(), language_cache=LanguageCache()
+    )
     
     # Transcribe audio
     transcript = transcriber.transcribe_from_url(audio_url, output_file)
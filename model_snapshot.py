@@ -0,0 +1,81 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+import torch
+from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor
+from main import MODEL_ID, PodcastTranscriber
+
+
+DEFAULT_SNAPSHOT_DIR = Path("models") / "whisper-tiny"
+SNAPSHOT_FILE = "snapshot.json"
+
+DTYPES = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+}
+
+
+def save_snapshot(model, processor, output_dir, source: str = "") -> str:
+    """Write a model and its processor as a self-contained safetensors snapshot."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model.save_pretrained(output_dir, safe_serialization=True)
+    processor.save_pretrained(output_dir)
+
+    with open(output_dir / SNAPSHOT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            "source": source,
+            "dtype": str(model.dtype).replace("torch.", ""),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }, f, indent=2)
+
+    return str(output_dir)
+
+
+def create_snapshot(output_dir=DEFAULT_SNAPSHOT_DIR, model_id: str = MODEL_ID, dtype: str = "float32") -> str:
+    """Download a model from the Hub once and save it as a local snapshot.
+
+    float16 halves the snapshot size and is what GPU runners use directly;
+    CPU runners upcast it to float32 at load time.
+    """
+    print(f"Downloading {model_id} ({dtype})")
+    model = AutoModelForSpeechSeq2Seq.from_pretrained(model_id, torch_dtype=DTYPES[dtype], use_safetensors=True)
+    processor = AutoProcessor.from_pretrained(model_id)
+
+    path = save_snapshot(model, processor, output_dir, model_id)
+    print(f"Snapshot saved to: {path}")
+    return path
+
+
+def main():
+    """Command-line entry point for creating and checking model snapshots."""
+    parser = argparse.ArgumentParser(description="Create or check a local Whisper model snapshot.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = commands.add_parser("create", help="Download a model and save it as a snapshot")
+    create_parser.add_argument("--model", default=MODEL_ID)
+    create_parser.add_argument("--output", default=str(DEFAULT_SNAPSHOT_DIR))
+    create_parser.add_argument("--dtype", choices=sorted(DTYPES), default="float32")
+
+    check_parser = commands.add_parser("check", help="Load a snapshot offline and report the load time")
+    check_parser.add_argument("path", nargs="?", default=str(DEFAULT_SNAPSHOT_DIR))
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "create":
+            create_snapshot(args.output, args.model, args.dtype)
+        else:
+            PodcastTranscriber(model_path=args.path, offline=True)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -67,14 +67,8 @@ Return only the cleaned transcript without any additional commentary."""
         return None
 
 
-def process_transcript_file(filepath: str) -> str:
-    """Process the transcript file and return cleaned version."""
-    
-    # Read the original transcript file
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Extract the transcript section
+def split_transcript_file(content: str):
+    """Split a transcript markdown file into its header and raw transcript text."""
     lines = content.split('\n')
     transcript_start = -1
     
@@ -84,8 +78,7 @@ def process_transcript_file(filepath: str) -> str:
             break
     
     if transcript_start == -1:
-        print("Error: Could not find transcript section")
-        return None
+        return None, None
     
     # Get the raw transcript
     transcript_lines = lines[transcript_start:]
@@ -95,19 +88,12 @@ def process_transcript_file(filepath: str) -> str:
     if "---" in raw_transcript:
         raw_transcript = raw_transcript.split("---")[0].strip()
     
-    print("Calling GitHub Models API to clean up transcript...")
-    
-    # Clean up the transcript using GitHub Models
-    cleaned_transcript = call_github_models(raw_transcript)
-    
-    if not cleaned_transcript:
-        print("Warning: Failed to clean transcript, using original")
-        cleaned_transcript = raw_transcript
-    
-    # Reconstruct the file with cleaned transcript
-    header_lines = lines[:transcript_start]
-    header_content = '\n'.join(header_lines)
-    
+    header_content = '\n'.join(lines[:transcript_start])
+    return header_content, raw_transcript
+
+
+def write_cleaned_file(filepath: str, header_content: str, cleaned_transcript: str) -> str:
+    """Write the cleaned transcript next to the original with a _cleaned suffix."""
     cleaned_content = f"""{header_content}
 
 {cleaned_transcript}
@@ -127,6 +113,33 @@ def process_transcript_file(filepath: str) -> str:
     return str(cleaned_path)
 
 
+def process_transcript_file(filepath: str) -> str:
+    """Process the transcript file and return cleaned version."""
+    
+    # Read the original transcript file
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    # Extract the transcript section
+    header_content, raw_transcript = split_transcript_file(content)
+    
+    if header_content is None:
+        print("Error: Could not find transcript section")
+        return None
+    
+    print("Calling GitHub Models API to clean up transcript...")
+    
+    # Clean up the transcript using GitHub Models
+    cleaned_transcript = call_github_models(raw_transcript)
+    
+    if not cleaned_transcript:
+        print("Warning: Failed to clean transcript, using original")
+        cleaned_transcript = raw_transcript
+    
+    # Reconstruct the file with cleaned transcript
+    return write_cleaned_file(filepath, header_content, cleaned_transcript)
+
+
 def main():
     """Main function for post-processing."""
     transcript_file = os.environ.get('TRANSCRIPT_FILE')
@@ -0,0 +1,324 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import torch
+from github_action_processor import create_transcript_file, process_github_issue
+from main import (
+    LANGUAGE_WINDOW_S, SAMPLING_RATE, LanguageCache, PodcastTranscriber, decode_to_pcm,
+    language_sample_starts, probe_duration, read_pcm
+)
+from word_index import build_word_index, word_index_path
+
+
+# Extra audio each shard transcribes on both sides of its range, so words
+# near a cut are decoded with full context by both neighbouring shards
+DEFAULT_OVERLAP_S = 10
+
+PLAN_FILE = "plan.json"
+# The compressed source is what travels between jobs; each shard decodes only its range
+SOURCE_FILE = "source_audio"
+# A fully decoded episode, used instead of the source when present
+PCM_FILE = "audio.pcm"
+ISSUE_FILE = "issue.json"
+
+
+def plan_shards(total_samples: int, shards: int, overlap_s: float = DEFAULT_OVERLAP_S,
+                sampling_rate: int = SAMPLING_RATE) -> list:
+    """Split an episode into time ranges, one per shard.
+
+    Each shard owns [keep_start, keep_end) and transcribes [start, end), which
+    adds overlap_s seconds on both sides (clamped to the episode).
+    """
+    overlap = int(overlap_s * sampling_rate)
+    bounds = [total_samples * i // shards for i in range(shards + 1)]
+
+    plan = []
+    for i in range(shards):
+        plan.append({
+            "index": i,
+            "keep_start": bounds[i],
+            "keep_end": bounds[i + 1],
+            "start": max(0, bounds[i] - overlap),
+            "end": min(total_samples, bounds[i + 1] + overlap),
+        })
+    return plan
+
+
+def audio_reader(work_dir):
+    """Return read(start, count) -> float32 samples for a prepared work_dir.
+
+    Reads from a decoded audio.pcm if there is one, otherwise decodes just the
+    requested range of the compressed source with ffmpeg.
+    """
+    work_dir = Path(work_dir)
+    pcm_path = work_dir / PCM_FILE
+    if pcm_path.exists():
+        return lambda start, count: read_pcm(str(pcm_path), start, count)
+
+    def read(start: int, count: int):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            range_path = os.path.join(temp_dir, "range.pcm")
+            decode_to_pcm(str(work_dir / SOURCE_FILE), range_path, SAMPLING_RATE,
+                          start / SAMPLING_RATE, count / SAMPLING_RATE)
+            return read_pcm(range_path, 0, count)
+
+    return read
+
+
+def transcribe_shard(transcriber, read, shard: dict, total_samples: int, cache_key: str = None) -> dict:
+    """Transcribe one shard's range of an episode into a segment with word timestamps.
+
+    read(start, count) returns samples of the episode. Every shard samples
+    the same windows of the whole episode for language detection, so all
+    shards decode in the same language. cache_key (the episode URL) keys
+    the language cache.
+    """
+    if transcriber.known_language(cache_key):
+        windows = []
+    else:
+        window = LANGUAGE_WINDOW_S * SAMPLING_RATE
+        windows = [read(start, window) for start in language_sample_starts(total_samples)]
+    transcriber.detect_episode_language(windows, cache_key)
+    audio = read(shard["start"], shard["end"] - shard["start"])
+    text = transcriber.transcribe_array(audio, SAMPLING_RATE, shard["start"] / SAMPLING_RATE)
+
+    return {
+        "index": shard["index"],
+        "keep_start": shard["keep_start"] / SAMPLING_RATE,
+        "keep_end": shard["keep_end"] / SAMPLING_RATE,
+        "text": text,
+        "words": [list(word) for word in transcriber.last_words],
+    }
+
+
+def merge_segments(segments: list):
+    """Stitch shard segments into one transcript.
+
+    In the overlap between two shards both transcribed the same audio; each
+    word is taken from the shard that owns the time at which it starts.
+    Returns (transcript, words).
+    """
+    words = []
+    for segment in sorted(segments, key=lambda segment: segment["index"]):
+        for start, end, text in segment["words"]:
+            if segment["keep_start"] <= start < segment["keep_end"]:
+                words.append((start, end, text))
+
+    transcript = "".join(text for _, _, text in words).strip()
+    return transcript, words
+
+
+def segment_path(work_dir, index: int) -> Path:
+    """Path of the segment file written for shard `index`."""
+    return Path(work_dir) / f"segment-{index}.json"
+
+
+def prepare(audio: str, shards: int, work_dir, overlap_s: float = DEFAULT_OVERLAP_S) -> list:
+    """Put an episode (file path or URL) into work_dir and write the shard plan.
+
+    The audio stays compressed; its length is read from the container so
+    nothing is decoded until the shards run.
+    """
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    source_path = work_dir / SOURCE_FILE
+
+    if audio.startswith(("http://", "https://")):
+        if not PodcastTranscriber(load_model=False).download_audio(audio, str(source_path)):
+            raise RuntimeError(f"Could not download {audio}")
+    else:
+        shutil.copyfile(audio, source_path)
+
+    total = int(probe_duration(str(source_path)) * SAMPLING_RATE)
+    plan = plan_shards(total, shards, overlap_s)
+
+    with open(work_dir / PLAN_FILE, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+
+    print(f"Planned {shards} shard(s) over {total / SAMPLING_RATE:.0f}s of audio")
+    return plan
+
+
+def run_shard(work_dir, index: int, transcriber_factory=None) -> str:
+    """Transcribe shard `index` of a prepared work_dir; returns the segment file path."""
+    with open(Path(work_dir) / PLAN_FILE, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    shard = plan[index]
+
+    # Episodes prepared from a GitHub issue record their URL for the language cache
+    issue_path = Path(work_dir) / ISSUE_FILE
+    cache_key = None
+    if issue_path.exists():
+        with open(issue_path, 'r', encoding='utf-8') as f:
+            cache_key = json.load(f).get("url")
+
+    if transcriber_factory is None:
+        # Models are loaded on first use, once the language is known
+        transcriber = PodcastTranscriber(load_model=False, word_timestamps=True, language_cache=LanguageCache())
+    else:
+        transcriber = transcriber_factory()
+
+    print(f"Transcribing shard {index}: {shard['start'] / SAMPLING_RATE:.0f}s - {shard['end'] / SAMPLING_RATE:.0f}s")
+    started = time.time()
+    segment = transcribe_shard(transcriber, audio_reader(work_dir), shard, plan[-1]["end"], cache_key)
+    # Wall-clock span of the shard, so parallelism can be checked without process start-up
+    segment["started"], segment["finished"] = started, time.time()
+
+    path = segment_path(work_dir, index)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(segment, f)
+
+    return str(path)
+
+
+def merge(work_dir, segment_dir=None):
+    """Merge every segment of a prepared work_dir; returns (transcript, words)."""
+    with open(Path(work_dir) / PLAN_FILE, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+
+    segments = []
+    for shard in plan:
+        path = segment_path(segment_dir or work_dir, shard["index"])
+        if not path.exists():
+            raise RuntimeError(f"Missing segment for shard {shard['index']}: {path}")
+        with open(path, 'r', encoding='utf-8') as f:
+            segments.append(json.load(f))
+
+    return merge_segments(segments)
+
+
+def _limit_threads(threads: int):
+    torch.set_num_threads(threads)
+
+
+def default_local_shards() -> int:
+    """Shards for a local run: each one loads its own model, so keep a few cores per shard."""
+    return max(1, min(4, (os.cpu_count() or 1) // 2))
+
+
+def run_shards(work_dir, transcriber_factory=None):
+    """Run every shard of a prepared work_dir in parallel processes.
+
+    Each process stands in for one matrix runner and loads its own model;
+    torch in each gets an equal share of the cores so they don't oversubscribe.
+    """
+    with open(Path(work_dir) / PLAN_FILE, 'r', encoding='utf-8') as f:
+        shards = len(json.load(f))
+
+    threads = max(1, (os.cpu_count() or 1) // shards)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=shards, initializer=_limit_threads, initargs=(threads,)) as executor:
+        futures = [executor.submit(run_shard, work_dir, i, transcriber_factory) for i in range(shards)]
+        for future in futures:
+            future.result()
+    print(f"Transcribed {shards} shard(s) in {time.perf_counter() - start:.2f}s")
+
+
+def run_local(audio: str, shards: int, work_dir, overlap_s: float = DEFAULT_OVERLAP_S,
+              transcriber_factory=None):
+    """Prepare, transcribe all shards in parallel processes and merge on this machine.
+
+    Returns (transcript, words).
+    """
+    prepare(audio, shards, work_dir, overlap_s)
+    run_shards(work_dir, transcriber_factory)
+    return merge(work_dir)
+
+
+def write_github_output(**values):
+    """Append step outputs to $GITHUB_OUTPUT (or print them when run locally)."""
+    github_output = os.environ.get('GITHUB_OUTPUT')
+    if github_output:
+        with open(github_output, 'a') as f:
+            for name, value in values.items():
+                f.write(f"{name}={value}\n")
+    else:
+        for name, value in values.items():
+            print(f"{name}={value}")
+
+
+def main():
+    """Command-line entry point for the sharded workflow and local runs."""
+    parser = argparse.ArgumentParser(description="Transcribe one episode in parallel shards.")
+    parser.add_argument("--work-dir", default="shard-work", help="Directory for the plan, source audio and segments")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prepare_parser = commands.add_parser("prepare", help="Fetch the audio and plan the shards")
+    prepare_parser.add_argument("audio", nargs="?", help="Audio file or URL (default: parse the GitHub issue)")
+    prepare_parser.add_argument("--shards", type=int, default=4)
+    prepare_parser.add_argument("--overlap", type=float, default=DEFAULT_OVERLAP_S)
+
+    shard_parser = commands.add_parser("shard", help="Transcribe one shard")
+    shard_parser.add_argument("index", type=int)
+
+    merge_parser = commands.add_parser("merge", help="Merge shard segments into a transcript file")
+    merge_parser.add_argument("--segment-dir", help="Directory holding the segment files (default: work dir)")
+
+    local_parser = commands.add_parser("local", help="Run every shard in parallel processes on this machine")
+    local_parser.add_argument("audio", help="Audio file or URL")
+    local_parser.add_argument("--shards", type=int, default=default_local_shards())
+    local_parser.add_argument("--overlap", type=float, default=DEFAULT_OVERLAP_S)
+    local_parser.add_argument("--output", help="Write the transcript text to this file")
+
+    args = parser.parse_args()
+    work_dir = Path(args.work_dir)
+
+    try:
+        if args.command == "prepare":
+            title, content = "", ""
+            audio = args.audio
+            if not audio:
+                title, audio, content = process_github_issue()
+                if not title or not audio:
+                    print("Error: Could not extract title or URL from issue")
+                    return 1
+
+            plan = prepare(audio, args.shards, work_dir, args.overlap)
+            with open(work_dir / ISSUE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({"title": title, "content": content, "url": audio}, f)
+
+            write_github_output(matrix=json.dumps([shard["index"] for shard in plan]), title=title)
+
+        elif args.command == "shard":
+            print(f"Segment saved to: {run_shard(work_dir, args.index)}")
+
+        elif args.command == "merge":
+            transcript, words = merge(work_dir, args.segment_dir)
+            if not transcript:
+                print("Error: Merged transcript is empty")
+                return 1
+
+            with open(work_dir / ISSUE_FILE, 'r', encoding='utf-8') as f:
+                issue = json.load(f)
+
+            filepath = create_transcript_file(issue["title"], issue["content"], transcript)
+            build_word_index(words, word_index_path(filepath))
+            print(f"Transcript saved to: {filepath}")
+            write_github_output(transcript_file=filepath, title=issue["title"])
+
+        else:
+            transcript, _ = run_local(args.audio, args.shards, work_dir, args.overlap)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(transcript)
+                print(f"Transcript saved to: {args.output}")
+            else:
+                print("\n--- TRANSCRIPT ---")
+                print(transcript)
+                print("--- END TRANSCRIPT ---")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,6 +33,12 @@ def check_python_syntax():
         "main.py",
         "github_action_processor.py", 
         "postprocess_transcript.py",
+        "fingerprint.py",
+        "feed_ingest.py",
+        "word_index.py",
+        "shard_transcription.py",
+        "model_snapshot.py",
+        "bulk_import.py",
         "test_processor.py",
         "setup_check.py"
     ]
@@ -55,7 +61,8 @@ def check_yaml_syntax():
     
     yaml_files = [
         ".github/ISSUE_TEMPLATE/podcast-transcription-request.yml",
-        ".github/workflows/transcribe-podcast.yml"
+        ".github/workflows/transcribe-podcast.yml",
+        ".github/workflows/transcribe-podcast-sharded.yml"
     ]
     
     all_good = True
@@ -0,0 +1,138 @@
+import re
+import sys
+from pathlib import Path
+import numpy as np
+
+
+# One .npy file per array so every lookup can memory-map just what it needs
+INDEX_FILES = ("starts", "ends", "words", "terms", "sorted_terms", "term_positions")
+
+
+def normalize_term(word: str) -> str:
+    """Lowercase a word and strip punctuation so lookups ignore formatting."""
+    return re.sub(r"[^\w']", "", word.lower()).strip("'")
+
+
+def word_index_path(transcript_path: str) -> Path:
+    """Directory holding the word index of a transcript file."""
+    path = Path(transcript_path)
+    return path.with_name(f"{path.stem}.words")
+
+
+def build_word_index(words: list, index_dir) -> str:
+    """Write a time-sorted word index for (start, end, word) tuples.
+
+    Times are stored in float32 arrays sorted by start time for range queries,
+    and the normalised terms are stored sorted alongside their positions so
+    word and phrase lookups are binary searches.
+    """
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    words = sorted(words, key=lambda word: word[0])
+    starts = np.array([start for start, _, _ in words], dtype=np.float32)
+    ends = np.array([end for _, end, _ in words], dtype=np.float32)
+    texts = np.array([text.strip() for _, _, text in words], dtype=str)
+    terms = np.array([normalize_term(text) for _, _, text in words], dtype=str)
+    order = np.argsort(terms, kind="stable")
+
+    arrays = {
+        "starts": starts,
+        "ends": ends,
+        "words": texts,
+        "terms": terms,
+        "sorted_terms": terms[order],
+        "term_positions": order.astype(np.int32),
+    }
+    for name, array in arrays.items():
+        np.save(index_dir / f"{name}.npy", array, allow_pickle=False)
+
+    return str(index_dir)
+
+
+class WordIndex:
+    """Read-only, memory-mapped view of a word index built by build_word_index."""
+
+    def __init__(self, index_dir):
+        index_dir = Path(index_dir)
+        for name in INDEX_FILES:
+            setattr(self, name, np.load(index_dir / f"{name}.npy", mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def find(self, phrase: str) -> list:
+        """Return (start, end) times of every occurrence of a word or phrase."""
+        tokens = [normalize_term(token) for token in phrase.split()]
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            return []
+
+        # All positions of the first word come from one binary search
+        lo = np.searchsorted(self.sorted_terms, tokens[0], side="left")
+        hi = np.searchsorted(self.sorted_terms, tokens[0], side="right")
+        positions = np.sort(self.term_positions[lo:hi])
+
+        matches = []
+        for position in positions:
+            last = position + len(tokens) - 1
+            if last >= len(self.terms):
+                break
+            if all(self.terms[position + i] == token for i, token in enumerate(tokens[1:], 1)):
+                # Times are stored as float32, report them to the millisecond
+                matches.append((round(float(self.starts[position]), 3), round(float(self.ends[last]), 3)))
+
+        return matches
+
+    def between(self, start: float, end: float) -> str:
+        """Return the words that start between two times (in seconds)."""
+        lo = np.searchsorted(self.starts, start, side="left")
+        hi = np.searchsorted(self.starts, end, side="right")
+        return " ".join(str(word) for word in self.words[lo:hi])
+
+
+def parse_time(value: str) -> float:
+    """Parse seconds given as 90, 90.5, 1:30 or 01:01:30."""
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_time(seconds: float) -> str:
+    """Format seconds as HH:MM:SS.ss."""
+    hours, rest = divmod(seconds, 3600)
+    minutes, rest = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{rest:05.2f}"
+
+
+def main():
+    """Command-line lookups against a transcript's word index."""
+    usage = (
+        "Usage: python word_index.py <transcript.md|index_dir> find <word or phrase>\n"
+        "       python word_index.py <transcript.md|index_dir> between <start> <end>"
+    )
+    if len(sys.argv) < 4 or sys.argv[2] not in ("find", "between"):
+        print(usage)
+        return 1
+
+    target = Path(sys.argv[1])
+    index = WordIndex(word_index_path(target) if target.suffix == ".md" else target)
+
+    if sys.argv[2] == "find":
+        matches = index.find(" ".join(sys.argv[3:]))
+        for start, end in matches:
+            print(f"{format_time(start)} - {format_time(end)}")
+        if not matches:
+            print("No matches found.")
+    else:
+        if len(sys.argv) < 5:
+            print(usage)
+            return 1
+        print(index.between(parse_time(sys.argv[3]), parse_time(sys.argv[4])))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())